@@ -2,6 +2,7 @@ import logging
 import re
 import sys
 from pathlib import Path
+from typing import Optional
 
 import click
 
@@ -55,7 +56,13 @@ def main():
     help="Mount path for resources (e.g., '/myapi/v1').",
     show_default=True,
 )
-def generate(input_file: Path, output_file: Path, transport: str, llms_txt_file: Optional[Path], mount_path: str):
+@click.option(
+    "--dedupe-models",
+    is_flag=True,
+    default=False,
+    help="Emit structurally identical schemas once and alias the duplicates to the first model.",
+)
+def generate(input_file: Path, output_file: Path, transport: str, llms_txt_file: Optional[Path], mount_path: str, dedupe_models: bool):
     """Generates MCP server code from an OpenAPI specification."""
     logger.info(f"Parsing OpenAPI specification from: {input_file}")
 
@@ -71,7 +78,7 @@ def generate(input_file: Path, output_file: Path, transport: str, llms_txt_file:
         sys.exit(1)
 
     logger.info(f"Generating MCP server code to: {output_file}")
-    generator = MCPGenerator(parser, transport=transport, mount_path=mount_path)
+    generator = MCPGenerator(parser, transport=transport, mount_path=mount_path, dedupe_models=dedupe_models)
 
     if not generator.generate(str(output_file)): # Generator's generate expects str path
         logger.error("MCP server code generation failed.")
@@ -1,35 +1,156 @@
+import functools
+import hashlib
+import json
+import keyword
 import logging
 import re
+import string
+import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, TextIO, Union
 
 from .parser import (HttpMethod, OpenAPIParser, Operation, Parameter,
                      ParameterLocation, Schema)
 
 logger = logging.getLogger(__name__)
 
-# Python keywords that cannot be used as variable names
-PYTHON_KEYWORDS = [
-    "False", "None", "True", "and", "as", "assert", "async", "await",
-    "break", "class", "continue", "def", "del", "elif", "else", "except",
-    "finally", "for", "from", "global", "if", "import", "in", "is",
-    "lambda", "nonlocal", "not", "or", "pass", "raise", "return", "try",
-    "while", "with", "yield"
-]
+# Python keywords that cannot be used as variable names (tracks the running interpreter's grammar)
+PYTHON_KEYWORDS = frozenset(keyword.kwlist)
 
+# Code templates for generated resources and tools. They are parsed once at
+# import time; each operation only pays for a single str.format call.
+_RESOURCE_TEMPLATE = """
+@Server.resource(path="{resource_path}")
+class {class_name}(AbstractResource[{response_model_name}]):
+{class_docstring}
+    async def query(self, ctx: Context, **kwargs) -> {response_model_name}: # Added Context type hint
+        logger.info(f"Executing resource: {class_name} with query params: {{ctx.payload}}")
+{param_extraction_str}
+
+        # --- Begin User-Implemented Logic ---
+        # Use extracted parameters ({param_usage_str}) to fetch/compute result.
+        raise NotImplementedError("Resource logic not implemented by the user.")
+        # Example: return {response_model_name}(...)
+        # --- End User-Implemented Logic ---
+"""
+
+_TOOL_TEMPLATE = """
+@Server.tool(name="{tool_name_mcp}")
+class {class_name}(AbstractTool[{request_model_name}, {response_model_name}]):
+{class_docstring}
+    async def execute(self, arg: {request_model_name}, ctx: Context) -> {response_model_name}: # Added Context
+
+        logger.info(f"Executing tool: {class_name} with input: {{arg}}")
+        {param_guidance}
+
+        # Example: Accessing path parameters if they were part of `arg`
+        # {path_param_vars} # This line is illustrative
+
+        # --- Begin User-Implemented Logic ---
+        # Replace with actual service call. Example for an HTTP endpoint:
+        # import httpx
+        # async with httpx.AsyncClient() as client:
+        #     response = await client.{http_method}(
+        #         url={url_fstring_prefix}"http://your-api-base{url_path_template}",
+        #         json=arg.model_dump(exclude_none=True) if isinstance(arg, BaseModel) and arg != BaseModel() else None,
+        #         # params={{key: val for key, val in arg.model_dump().items() if key not in path_params and val is not None}} # if query params are in arg
+        #     )
+        #     response.raise_for_status()
+        #     if "{response_model_name}" != "None":
+        #         return {response_model_name}(**response.json())
+        #     return None
+        raise NotImplementedError("Tool logic not implemented by the user.")
+        # --- End User-Implemented Logic ---
+
+"""
+
+_MAIN_TEMPLATE = """
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger.info("Starting MCP server...")
+
+{transport_config}
+
+    # Assuming 'app' is the Server instance, defined globally after imports.
+    # Resources and Tools are registered to 'app' using decorators.
+    app.serve(transport=transport)
+
+if __name__ == "__main__":
+    main()
+"""
+
+# The main() block only varies by transport, so each variant is rendered once at import time
+_MAIN_BLOCKS = {
+    "stdio": _MAIN_TEMPLATE.format(transport_config="    transport = BlockingStdioTransport()"),
+    "google_pubsub": _MAIN_TEMPLATE.format(transport_config="""
+    project_id = "YOUR_GCP_PROJECT_ID"  # Replace
+    mcp_subscription_id = "YOUR_MCP_PUBSUB_SUBSCRIPTION"  # Replace
+    agent_topic_id = "YOUR_AGENT_PUBSUB_TOPIC"  # Replace
+    transport = GooglePubSubTransport(
+        project_id=project_id,
+        mcp_subscription_id=mcp_subscription_id,
+        agent_topic_id=agent_topic_id,
+    )"""),
+}
+_DEFAULT_MAIN_BLOCK = _MAIN_TEMPLATE.format(
+    transport_config="    transport = BlockingStdioTransport() # Default or unrecognized transport"
+)
+
+# OpenAPI primitive type -> Python annotation
+_PRIMITIVE_MAP = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+}
+
+# Annotations emitted over and over; bound once so every caller shares the same objects
+_ANY = "Any"
+_LIST_ANY = sys.intern("List[Any]")
+_DICT_STR_ANY = sys.intern("Dict[str, Any]")
+
+# Annotations the parser already emits in their final Python form
+_PYTHON_SCALAR_TYPES = frozenset({"str", "int", "float", "bool", "datetime", "date", "bytes", "Any"})
+
+# Container annotations produced by the parser, e.g. "List[Pet]" / "Dict[str, int]"
+_LIST_TYPE_RE = re.compile(r"List\[(.+)\]")
+_DICT_TYPE_RE = re.compile(r"Dict\[str, (.+)\]")
+
+# Matches a {placeholder} in an OpenAPI path template
+_PATH_TEMPLATE_PARAM_RE = re.compile(r"\{([^}]+)\}")
+
+
+class _IdentifierCharTable(dict):
+    """str.translate table: keeps [0-9a-zA-Z_] as-is and maps every other code point to '_'."""
+
+    def __missing__(self, codepoint: int) -> int:
+        return ord("_")
+
+
+_IDENTIFIER_CHAR_TABLE = _IdentifierCharTable(
+    (ord(c), ord(c)) for c in string.ascii_letters + string.digits + "_"
+)
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_variable_name(name: str) -> str:
     """
     Sanitizes a string to be a valid Python variable name.
     - Replaces invalid characters with underscores.
     - Prepends an underscore if it starts with a digit or is empty.
     - Appends an underscore if it's a Python keyword.
+    Results are memoized: the same property/parameter names recur across
+    every model, resource, tool and llms.txt entry of a spec.
     """
     if not isinstance(name, str):
         name = str(name)
 
+    # Fast path: most names are already plain ASCII identifiers (isidentifier alone would accept non-ASCII letters)
+    if name.isascii() and name.isidentifier():
+        return name + "_" if name in PYTHON_KEYWORDS else name
+
     # Replace invalid characters (anything not a letter, digit, or underscore)
-    # Also, ensure it doesn't start with a digit by prepending underscore if so.
-    name = re.sub(r'[^0-9a-zA-Z_]', '_', name)
+    # in a single C-level pass; no regex engine involved.
+    name = name.translate(_IDENTIFIER_CHAR_TABLE)
 
     if not name: # if name became empty after sanitization
         return "_var"
@@ -43,13 +164,25 @@ def sanitize_variable_name(name: str) -> str:
     return name
 
 
+def _escape_docstring(text: str) -> str:
+    """Escapes text so it can be embedded in a triple-quoted docstring."""
+    if '"""' in text: # Rare; skip the replace pass entirely otherwise
+        text = text.replace('"""', '\\"\\"\\"')
+    return text
+
+
 class MCPGenerator:
-    def __init__(self, parser: OpenAPIParser, transport: str = "stdio", mount_path: str = ""):
+    def __init__(self, parser: OpenAPIParser, transport: str = "stdio", mount_path: str = "", dedupe_models: bool = False):
         self.parser = parser
         self.transport = transport
         self.mount_path = mount_path.strip("/") # Ensure no leading/trailing slashes for mount_path
+        self.dedupe_models = dedupe_models # Emit `Alias = FirstModel` for structurally identical schemas
         self._model_name_map: Dict[str, str] = {} # Maps original schema name to Pydantic model name
         self._generated_model_names: Set[str] = set() # Tracks names of models already generated
+        self._op_meta: Dict[int, Dict[str, Any]] = {} # Per-operation sanitized names and type hints, keyed by id(operation)
+        self._resource_ops: List[Operation] = [] # GET operations, rendered as resources
+        self._tool_ops: List[Operation] = [] # All other operations, rendered as tools
+        self._type_str_cache: Dict[tuple, str] = {} # (type string, is_optional) -> mapped annotation
 
     def generate(self, output_file: str) -> bool:
         """Orchestrates the code generation and writing to file."""
@@ -57,12 +190,12 @@ class MCPGenerator:
         try:
             # Pre-populate model name map to handle dependencies correctly
             self._prepare_model_name_map()
+            self._prepare_operation_meta()
 
-            code = self._generate_code()
             output_path = Path(output_file)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, "w") as f:
-                f.write(code)
+            with open(output_path, "w", buffering=1 << 20) as f:
+                self._write_code(f)
             logger.info(f"MCP server code successfully generated at {output_path}")
             return True
         except Exception as e:
@@ -71,11 +204,35 @@ class MCPGenerator:
 
     def _prepare_model_name_map(self):
         """First pass: collect all schema names and map them to valid Pydantic class names."""
+        self._type_str_cache.clear() # Mapped annotations depend on the name map being rebuilt here
         for schema_name in self.parser.schemas.keys():
             pydantic_model_name = self._sanitize_pydantic_model_name(schema_name)
             self._model_name_map[schema_name] = pydantic_model_name
 
 
+    def _prepare_operation_meta(self):
+        """Second pass: index operations once. Splits them into resources (GET) and tools (everything else),
+        and sanitizes operation/parameter names and maps parameter types once per operation.
+        Resources, tools and llms.txt all read from this index instead of re-scanning parser.operations.
+        Requires self._model_name_map to be populated.
+        """
+        # Keyed by object identity: distinct operationIds can sanitize to the same operation_id
+        self._op_meta = {}
+        self._resource_ops = []
+        self._tool_ops = []
+        resource_path_prefix = f"{self.mount_path}/" if self.mount_path else "" # Same for every operation
+        for op in self.parser.operations:
+            (self._resource_ops if op.method == HttpMethod.GET else self._tool_ops).append(op)
+            self._op_meta[id(op)] = {
+                "class_base": self.parser._sanitize_name(op.operation_id),
+                "resource_path": resource_path_prefix + op.operation_id,
+                "sanitized_params": [
+                    (p, sanitize_variable_name(p.name), self._map_openapi_type_to_pydantic(p.type, is_optional=not p.required))
+                    for p in op.parameters
+                ],
+            }
+
+
     def _sanitize_pydantic_model_name(self, name: str) -> str:
         """ Sanitizes a schema name to be a valid Pydantic model class name.
             Ensures it starts with uppercase and is a valid Python identifier.
@@ -98,21 +255,23 @@ class MCPGenerator:
         return name
 
 
-    def _generate_code(self) -> str:
-        """Calls the other _generate_* internal methods to build the full code string."""
-        imports = self._generate_imports()
-        models = self._generate_models() # This needs self._model_name_map to be populated
-        app_init = self._generate_app_init()
-        resources = self._generate_resources()
-        tools = self._generate_tools()
-        main_block = self._generate_main()
-
-        return f"{imports}\n\n{models}\n\n{app_init}\n\n{resources}\n\n{tools}\n\n{main_block}\n"
+    def _write_code(self, fh: TextIO) -> None:
+        """Writes the full server module to `fh` section by section, without building it in memory first."""
+        fh.write(self._generate_imports())
+        fh.write("\n\n")
+        self._write_models(fh) # This needs self._model_name_map to be populated
+        fh.write("\n\n")
+        fh.write(self._generate_app_init())
+        fh.write("\n\n")
+        fh.write(self._generate_resources())
+        fh.write("\n\n")
+        fh.write(self._generate_tools())
+        fh.write("\n\n")
+        fh.write(self._generate_main())
+        fh.write("\n")
 
     def _generate_imports(self) -> str:
         """Generates necessary import statements."""
-        uses_datetime = False
-        uses_date = False
         # Pydantic V2 doesn't need List, Optional, Any, Dict from typing for simple cases
         # but good to have them for more complex scenarios or if user adds custom types.
 
@@ -120,7 +279,8 @@ class MCPGenerator:
         for schema in self.parser.schemas.values():
             type_strings_to_check.append(schema.type)
             for prop_def in schema.properties.values():
-                type_strings_to_check.append(prop_def['type'] if isinstance(prop_def, dict) else str(prop_def))
+                # Parser property entries are either a type string or a dict carrying it under 'type'
+                type_strings_to_check.append(prop_def['type'] if isinstance(prop_def, dict) else prop_def)
 
         for op in self.parser.operations:
             for param in op.parameters:
@@ -130,10 +290,11 @@ class MCPGenerator:
             if op.response_schema:
                 type_strings_to_check.append(op.response_schema.type)
 
-        for type_str in type_strings_to_check:
-            s_type_str = str(type_str) # Ensure it's a string
-            if "datetime" in s_type_str: uses_datetime = True
-            if "date" in s_type_str and "datetime" not in s_type_str: uses_date = True # Avoid date if datetime is already true for 'date-time'
+        # Scan all type strings at once rather than two substring checks per string.
+        # OpenAPI 3.1 list-valued types (e.g. ["object", "null"]) never name a date type, so they are skipped.
+        all_types = "\n".join(t for t in type_strings_to_check if isinstance(t, str))
+        uses_datetime = "datetime" in all_types
+        uses_date = "date" in (all_types.replace("datetime", "") if uses_datetime else all_types) # 'date' inside 'datetime' doesn't count
 
         import_statements = [
             "import logging",
@@ -155,53 +316,54 @@ class MCPGenerator:
 
     def _map_openapi_type_to_pydantic(self, openapi_type_info: Union[str, Dict[str, Any]], is_optional: bool = False) -> str:
         """Maps OpenAPI type (and format) to Pydantic field types."""
-        final_type_str = "Any" # Default
+        final_type_str = _ANY # Default
+        cache_key = None
 
-        if isinstance(openapi_type_info, str): # Already a string, likely a schema name or basic python type
+        if type(openapi_type_info) is str: # Already a string, likely a schema name or basic python type
             type_str = openapi_type_info
-
-            list_match = re.match(r"List\[(.+)\]", type_str)
-            dict_match = re.match(r"Dict\[str, (.+)\]", type_str) # Assuming Dict[str, Type]
-
-            if list_match:
+            # Parameter and property types repeat across the whole spec; map each string once per run.
+            cache_key = (type_str, is_optional)
+            cached = self._type_str_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            # Plain names are by far the most common input; resolve them before trying any regex.
+            if type_str in _PYTHON_SCALAR_TYPES:
+                final_type_str = type_str
+            elif type_str in self._model_name_map: # It's a reference to another schema
+                final_type_str = self._model_name_map[type_str]
+            elif list_match := _LIST_TYPE_RE.match(type_str):
                 inner_type = list_match.group(1)
                 mapped_inner_type = self._map_openapi_type_to_pydantic(inner_type)
                 final_type_str = f"List[{mapped_inner_type}]"
-            elif dict_match:
+            elif dict_match := _DICT_TYPE_RE.match(type_str): # Assuming Dict[str, Type]
                 value_type = dict_match.group(1)
                 mapped_value_type = self._map_openapi_type_to_pydantic(value_type)
                 final_type_str = f"Dict[str, {mapped_value_type}]"
-            elif type_str in self._model_name_map: # It's a reference to another schema
-                final_type_str = self._model_name_map[type_str]
-            elif type_str in ["str", "int", "float", "bool", "datetime", "date", "bytes", "Any"]:
-                final_type_str = type_str
             else: # Unrecognized string, could be a schema name not found in map (should not happen if _prepare_model_name_map ran)
                   # Or an inline enum/literal type if parser supports that.
                   # Fallback: sanitize and use as is, or default to Any.
                   # For now, assume it's a model name that should have been mapped.
                   # If it's from schema.type directly for a non-object schema, it might be like "string".
                 logger.warning(f"Unmapped type string '{type_str}' encountered. Defaulting to Any or using sanitized name.")
-                # Try to map basic OpenAPI types if they appear here directly
-                if type_str == "string": final_type_str = "str"
-                elif type_str == "integer": final_type_str = "int"
-                elif type_str == "number": final_type_str = "float"
-                elif type_str == "boolean": final_type_str = "bool"
-                else: final_type_str = self._sanitize_pydantic_model_name(type_str) # Assume it's a schema name
-
-        elif isinstance(openapi_type_info, dict): # Property definition from parser
+                # Try to map basic OpenAPI types if they appear here directly, else assume it's a schema name
+                final_type_str = _PRIMITIVE_MAP.get(type_str) or self._sanitize_pydantic_model_name(type_str)
+
+        elif type(openapi_type_info) is dict: # Property definition from parser
             oas_type = openapi_type_info.get("type")
 
             if openapi_type_info.get("is_ref"): # Property referencing another schema
                 ref_name = oas_type # Parser puts sanitized schema name into 'type' for refs
-                final_type_str = self._model_name_map.get(ref_name, self._sanitize_pydantic_model_name(ref_name))
-            elif oas_type == "string": final_type_str = "str" # format handled by parser into specific types like date/datetime if applicable
-            elif oas_type == "integer": final_type_str = "int"
-            elif oas_type == "number": final_type_str = "float"
-            elif oas_type == "boolean": final_type_str = "bool"
+                final_type_str = self._model_name_map.get(ref_name) or self._sanitize_pydantic_model_name(ref_name)
+            elif oas_type in _PRIMITIVE_MAP: # format handled by parser into specific types like date/datetime if applicable
+                final_type_str = _PRIMITIVE_MAP[oas_type]
             elif oas_type == "array":
-                items_def = openapi_type_info.get("items", {"type": "Any"}) # Default for items
-                item_type_str = self._map_openapi_type_to_pydantic(items_def) # Recursive call
-                final_type_str = f"List[{item_type_str}]"
+                items_def = openapi_type_info.get("items")
+                if not items_def: # Untyped array, no need to recurse
+                    final_type_str = _LIST_ANY
+                else:
+                    item_type_str = self._map_openapi_type_to_pydantic(items_def) # Recursive call
+                    final_type_str = f"List[{item_type_str}]"
             elif oas_type == "object":
                 # Inline object definition. Could be Dict[str, Any] or a nested anonymous model.
                 # For simplicity, map to Dict[str, Any] or use additionalProperties if defined.
@@ -211,18 +373,18 @@ class MCPGenerator:
                         ap_type = self._map_openapi_type_to_pydantic(ap_def)
                         final_type_str = f"Dict[str, {ap_type}]"
                     elif isinstance(ap_def, bool) and ap_def: # additionalProperties: true
-                        final_type_str = "Dict[str, Any]"
+                        final_type_str = _DICT_STR_ANY
                     else: # additionalProperties: false or not a schema
-                        final_type_str = "Dict[str, Any]" # Or raise error/handle specific model
+                        final_type_str = _DICT_STR_ANY # Or raise error/handle specific model
                 elif openapi_type_info.get("is_inline_complex"): # Hint from _get_python_type
                     # This means it's an object with properties but not a named schema.
                     # Ideally, the generator would create an inline Pydantic model for this.
                     # For now, we'll use Dict[str, Any] as a placeholder.
                     # A more advanced generator might create a nested class here.
                     logger.warning(f"Inline complex object found, mapping to Dict[str, Any]. Consider defining as a separate schema.")
-                    final_type_str = "Dict[str, Any]"
+                    final_type_str = _DICT_STR_ANY
                 else:
-                    final_type_str = "Dict[str, Any]"
+                    final_type_str = _DICT_STR_ANY
             # If oas_type is None but there's a ref, it should be handled by 'is_ref' logic.
             # If oas_type is a schema name itself (e.g. from param.type = "MySchemaName")
             elif oas_type in self._model_name_map:
@@ -232,15 +394,24 @@ class MCPGenerator:
         if is_optional and not final_type_str.startswith("Optional[") and not final_type_str.startswith("Union["):
             final_type_str = f"Optional[{final_type_str}]"
 
+        # The same handful of annotations ("Optional[str]", "List[Any]", model names...) come back
+        # thousands of times on big specs; intern them so equal results share one object.
+        final_type_str = sys.intern(final_type_str)
+        if cache_key is not None:
+            self._type_str_cache[cache_key] = final_type_str
         return final_type_str
 
 
-    def _generate_models(self) -> str:
-        """Generates Pydantic model definitions from OpenAPI schemas."""
-        model_strs = []
+    def _write_models(self, fh: TextIO) -> None:
+        """Writes Pydantic model definitions from OpenAPI schemas to `fh`, one model at a time."""
+        schemas = self.parser.schemas
+        if not schemas: # Nothing to emit; the caller's surrounding blank lines are all that remains
+            return
+        separator = ""
+        seen_shapes: Dict[bytes, str] = {} # Schema digest -> class name of the first model with that shape
         # self._model_name_map should be populated by _prepare_model_name_map
 
-        for schema_name, schema_obj in self.parser.schemas.items():
+        for schema_name, schema_obj in schemas.items():
             # Only generate for schemas that are meant to be objects with properties
             # The parser sets schema.type to the schema name if it's an object type.
             # Or if it's a complex type that should become a Pydantic model.
@@ -249,13 +420,23 @@ class MCPGenerator:
             is_object_schema = schema_obj.type == schema_name or schema_obj.properties
 
             if is_object_schema and schema_name not in self._generated_model_names:
-                 model_str = self._generate_model(schema_obj)
+                 model_str = None
+                 class_name = self._model_name_map.get(schema_name)
+                 if self.dedupe_models and schema_obj.raw_schema and class_name:
+                     digest = hashlib.blake2b(
+                         json.dumps(schema_obj.raw_schema, sort_keys=True, default=str).encode()
+                     ).digest()
+                     first_class_name = seen_shapes.setdefault(digest, class_name)
+                     if first_class_name != class_name: # Same shape already emitted under another name
+                         model_str = f"{class_name} = {first_class_name}"
+                 if model_str is None:
+                     model_str = self._generate_model(schema_obj)
                  if model_str:
-                    model_strs.append(model_str)
+                    fh.write(separator)
+                    fh.write(model_str)
+                    separator = "\n\n"
                     self._generated_model_names.add(schema_name) # Mark as generated
 
-        return "\n\n".join(model_strs)
-
     def _generate_model(self, schema: Schema) -> str:
         """Generates a single Pydantic model class string."""
         class_name = self._model_name_map.get(schema.name)
@@ -264,17 +445,18 @@ class MCPGenerator:
             return ""
 
         fields = []
+        required_properties = schema.required_set
         for prop_name, prop_def_raw in schema.properties.items():
             field_name = sanitize_variable_name(prop_name)
-            is_required = prop_name in schema.required_properties
+            is_required = prop_name in required_properties
 
-            # prop_def_raw can be a string (type name) or dict (full schema for property)
-            pydantic_type = self._map_openapi_type_to_pydantic(prop_def_raw, is_optional=not is_required)
+            # prop_def_raw can be a string (type name) or dict (full schema for property).
+            # Map to the bare type; Optional[...] is applied exactly once below.
+            pydantic_type = self._map_openapi_type_to_pydantic(prop_def_raw)
 
             field_args = []
             if not is_required:
                 # Pydantic V2 handles Optional[...] automatically with `= None`
-                # So, `pydantic_type` will already be Optional[ActualType] via `is_optional` flag.
                 field_args.append("default=None")
             else:
                 # For required fields, if you want to use Field() e.g. for description
@@ -285,7 +467,8 @@ class MCPGenerator:
                 description = prop_def_raw.get("description")
 
             if description:
-                escaped_description = description.replace('"', '\\"')
+                # Most descriptions contain no quotes; skip the replace pass for them
+                escaped_description = description.replace('"', '\\"') if '"' in description else description
                 field_args.append(f'description="{escaped_description}"')
 
             # Add alias if original prop_name is different from field_name (e.g. due to sanitization for keywords)
@@ -293,45 +476,29 @@ class MCPGenerator:
             # if field_name != prop_name:
             #    field_args.append(f'alias="{prop_name}"')
 
-
-            if field_args: # Using Field(...)
-                 # If default=None, pydantic_type should be Optional[X]
-                 # If default=..., pydantic_type should be X (not Optional)
-                 # _map_openapi_type_to_pydantic handles making it Optional if not is_required
-                 actual_type_for_annotation = pydantic_type
-                 if not is_required and not actual_type_for_annotation.startswith("Optional["):
-                     actual_type_for_annotation = f"Optional[{actual_type_for_annotation}]"
-                 elif is_required and actual_type_for_annotation.startswith("Optional["): # Strip Optional if required
-                     match = re.match(r"Optional\[(.+)\]", actual_type_for_annotation)
-                     if match: actual_type_for_annotation = match.group(1)
-
-
-                 fields.append(f"    {field_name}: {actual_type_for_annotation} = Field({', '.join(field_args)})")
-            else: # Simple annotation: name: type
-                 fields.append(f"    {field_name}: {pydantic_type}")
-
+            annotation = pydantic_type if is_required else f"Optional[{pydantic_type}]"
+            fields.append(f"    {field_name}: {annotation} = Field({', '.join(field_args)})")
 
         if not fields : # Pydantic model needs at least 'pass'
              fields.append("    pass  # No properties defined for this model.")
 
-        model_docstring_content = schema.description or f"Pydantic model for {schema.name}"
+        model_docstring_content = _escape_docstring(schema.description or f"Pydantic model for {schema.name}")
         model_docstring = f'    """\n    {model_docstring_content}\n    """'
 
-        model_def = f"class {class_name}(BaseModel):\n"
-        if model_docstring: model_def += f"{model_docstring}\n"
-        model_def += "\n".join(fields)
-
-        return model_def
+        parts = [f"class {class_name}(BaseModel):", model_docstring]
+        parts.extend(fields)
+        return "\n".join(parts)
 
     def _generate_app_init(self) -> str:
         return "app = Server()"
 
     def _generate_resources(self) -> str:
-        resource_strs = [self._generate_resource(op) for op in self.parser.operations if op.method == HttpMethod.GET]
-        return "\n\n".join(filter(None, resource_strs))
+        resource_strs = (self._generate_resource(op) for op in self._resource_ops)
+        return "\n\n".join(s for s in resource_strs if s)
 
     def _generate_resource(self, operation: Operation) -> str:
-        class_name_base = self.parser._sanitize_name(operation.operation_id) # Use parser's sanitize
+        op_meta = self._op_meta[id(operation)]
+        class_name_base = op_meta["class_base"]
         class_name = (class_name_base[0].upper() + class_name_base[1:] if class_name_base else "") + "Resource"
         if not class_name or not class_name[0].isupper(): class_name = "_" + class_name
 
@@ -342,47 +509,37 @@ class MCPGenerator:
             response_model_name = self._map_openapi_type_to_pydantic(operation.response_schema.type)
 
 
-        resource_path = f"{self.mount_path}/{operation.operation_id}" if self.mount_path else operation.operation_id
-        class_docstring = f'    """Resource for: {operation.summary or operation.operation_id}"""'
-
-        param_extraction_lines = []
-        param_usage_comments = []
-        for param in operation.parameters:
-            var_name = sanitize_variable_name(param.name)
-            param_type_hint = self._map_openapi_type_to_pydantic(param.type, is_optional=not param.required)
-
-            # In MCP, query params for resources are in ctx.payload
-            if param.required:
-                param_extraction_lines.append(f"        {var_name}: {param_type_hint} = ctx.payload['{param.name}']")
-            else:
-                param_extraction_lines.append(f"        {var_name}: {param_type_hint} = ctx.payload.get('{param.name}')")
-            param_usage_comments.append(var_name)
+        resource_path = op_meta["resource_path"]
+        class_docstring = f'    """Resource for: {_escape_docstring(operation.summary or operation.operation_id)}"""'
 
+        sanitized_params = op_meta["sanitized_params"]
+        # In MCP, query params for resources are in ctx.payload
+        param_extraction_lines = [
+            f"        {var_name}: {param_type_hint} = ctx.payload['{param.name}']"
+            if param.required
+            else f"        {var_name}: {param_type_hint} = ctx.payload.get('{param.name}')"
+            for param, var_name, param_type_hint in sanitized_params
+        ]
 
         param_extraction_str = "\n".join(param_extraction_lines) or "        # No parameters to extract directly from payload for this resource."
-        param_usage_str = ", ".join(param_usage_comments)
-
-        return f"""
-@Server.resource(path="{resource_path}")
-class {class_name}(AbstractResource[{response_model_name}]):
-{class_docstring}
-    async def query(self, ctx: Context, **kwargs) -> {response_model_name}: # Added Context type hint
-        logger.info(f"Executing resource: {class_name} with query params: {{ctx.payload}}")
-{param_extraction_str}
+        param_usage_str = ", ".join(var_name for _, var_name, _ in sanitized_params)
 
-        # --- Begin User-Implemented Logic ---
-        # Use extracted parameters ({param_usage_str}) to fetch/compute result.
-        raise NotImplementedError("Resource logic not implemented by the user.")
-        # Example: return {response_model_name}(...)
-        # --- End User-Implemented Logic ---
-"""
+        return _RESOURCE_TEMPLATE.format(
+            resource_path=resource_path,
+            class_name=class_name,
+            response_model_name=response_model_name,
+            class_docstring=class_docstring,
+            param_extraction_str=param_extraction_str,
+            param_usage_str=param_usage_str,
+        )
 
     def _generate_tools(self) -> str:
-        tool_strs = [self._generate_tool(op) for op in self.parser.operations if op.method != HttpMethod.GET]
-        return "\n\n".join(filter(None, tool_strs))
+        tool_strs = (self._generate_tool(op) for op in self._tool_ops)
+        return "\n\n".join(s for s in tool_strs if s)
 
     def _generate_tool(self, operation: Operation) -> str:
-        class_name_base = self.parser._sanitize_name(operation.operation_id)
+        op_meta = self._op_meta[id(operation)]
+        class_name_base = op_meta["class_base"]
         class_name = (class_name_base[0].upper() + class_name_base[1:] if class_name_base else "") + "Tool"
         if not class_name or not class_name[0].isupper(): class_name = "_" + class_name
 
@@ -402,69 +559,53 @@ class {class_name}(AbstractResource[{response_model_name}]):
             response_model_name = self._map_openapi_type_to_pydantic(operation.response_schema.type)
 
         tool_name_mcp = operation.operation_id
-        class_docstring = f'    """Tool for: {operation.summary or operation.operation_id} (Method: {operation.method.value.upper()}, Path: {operation.path})"""'
+        class_docstring = f'    """Tool for: {_escape_docstring(operation.summary or operation.operation_id)} (Method: {operation.method.value.upper()}, Path: {operation.path})"""'
 
-        # Guidance for parameters (path, query, header)
+        # Partition parameters once: path params are part of URL construction,
+        # query/header/cookie params only show up as guidance comments.
+        path_params, other_params = [], []
+        for param_meta in op_meta["sanitized_params"]:
+            (path_params if param_meta[0].location == ParameterLocation.PATH else other_params).append(param_meta)
+
+        # Guidance for parameters (query, header, cookie)
         param_guidance_lines = ["# This tool might use the following parameters not part of the direct input model:"]
-        has_other_params = False
-        for p in operation.parameters:
+        for p, _, p_type_hint in other_params:
             # Request body schema (if any) is handled by `arg: {request_model_name}`
-            # Path, query, header params might need to be handled from ctx or kwargs
-            if p.location != ParameterLocation.PATH: # Path params are part of URL construction
-                 p_type_hint = self._map_openapi_type_to_pydantic(p.type, is_optional=not p.required)
-                 line = f"#   - {p.name} ({p.location.value}, type: {p_type_hint})"
-                 if not p.required: line += " (optional)"
-                 param_guidance_lines.append(line)
-                 has_other_params = True
+            # Query, header params might need to be handled from ctx or kwargs
+            optional_note = "" if p.required else " (optional)"
+            param_guidance_lines.append(f"#   - {p.name} ({p.location.value}, type: {p_type_hint}){optional_note}")
 
-        param_guidance = "\n        ".join(param_guidance_lines) if has_other_params else "# All parameters are expected to be in the input model or path."
+        param_guidance = "\n        ".join(param_guidance_lines) if other_params else "# All parameters are expected to be in the input model or path."
 
         # Construct placeholder URL for HTTP call guidance
         url_path_template = operation.path
         path_param_vars = []
-        for p_op_param in operation.parameters:
-            if p_op_param.location == ParameterLocation.PATH:
-                sanitized_param_name = sanitize_variable_name(p_op_param.name)
-                url_path_template = url_path_template.replace(f"{{{p_op_param.name}}}", f"{{{sanitized_param_name}}}")
-                # Assume path params might come from input model `arg` if not a dedicated request body
-                path_param_vars.append(f'{sanitized_param_name}=arg.{sanitized_param_name} if hasattr(arg, "{sanitized_param_name}") else "TODO_path_param_{sanitized_param_name}"')
-
-
-        url_fstring_prefix = "f" if "{ rumoured_dead_name_for_a_variable_that_should_not_exist }" in url_path_template else "" # Hack to force f-string if needed by var names
-        if any(p.location == ParameterLocation.PATH for p in operation.parameters): url_fstring_prefix = "f"
-
-
-        # Tool execute method body
-        execute_body = f"""
-        logger.info(f"Executing tool: {class_name} with input: {{arg}}")
-        {param_guidance}
-
-        # Example: Accessing path parameters if they were part of `arg`
-        # {(', '.join(path_param_vars))} # This line is illustrative
-
-        # --- Begin User-Implemented Logic ---
-        # Replace with actual service call. Example for an HTTP endpoint:
-        # import httpx
-        # async with httpx.AsyncClient() as client:
-        #     response = await client.{operation.method.value.lower()}(
-        #         url={url_fstring_prefix}"http://your-api-base{url_path_template}",
-        #         json=arg.model_dump(exclude_none=True) if isinstance(arg, BaseModel) and arg != BaseModel() else None,
-        #         # params={{key: val for key, val in arg.model_dump().items() if key not in path_params and val is not None}} # if query params are in arg
-        #     )
-        #     response.raise_for_status()
-        #     if "{response_model_name}" != "None":
-        #         return {response_model_name}(**response.json())
-        #     return None
-        raise NotImplementedError("Tool logic not implemented by the user.")
-        # --- End User-Implemented Logic ---
-"""
-        return f"""
-@Server.tool(name="{tool_name_mcp}")
-class {class_name}(AbstractTool[{request_model_name}, {response_model_name}]):
-{class_docstring}
-    async def execute(self, arg: {request_model_name}, ctx: Context) -> {response_model_name}: # Added Context
-{execute_body}
-"""
+        if path_params:
+            # Rewrite every {name} placeholder to its sanitized variable name in one pass
+            path_var_names = {p.name: sanitized for p, sanitized, _ in path_params}
+            url_path_template = _PATH_TEMPLATE_PARAM_RE.sub(
+                lambda m: "{" + path_var_names.get(m.group(1), m.group(1)) + "}", url_path_template
+            )
+        for p_op_param, sanitized_param_name, _ in path_params:
+            # Assume path params might come from input model `arg` if not a dedicated request body
+            path_param_vars.append(f'{sanitized_param_name}=arg.{sanitized_param_name} if hasattr(arg, "{sanitized_param_name}") else "TODO_path_param_{sanitized_param_name}"')
+
+
+        url_fstring_prefix = "f" if path_params else "" # Path placeholders need an f-string URL
+
+
+        return _TOOL_TEMPLATE.format(
+            tool_name_mcp=tool_name_mcp,
+            class_name=class_name,
+            request_model_name=request_model_name,
+            response_model_name=response_model_name,
+            class_docstring=class_docstring,
+            param_guidance=param_guidance,
+            path_param_vars=", ".join(path_param_vars),
+            http_method=operation.method.value.lower(),
+            url_fstring_prefix=url_fstring_prefix,
+            url_path_template=url_path_template,
+        )
 
     def _generate_function_params(self, operation: Operation, include_ctx: bool = False) -> str:
         # This method seems less used now as Resources/Tools have fixed signatures.
@@ -492,41 +633,17 @@ class {class_name}(AbstractTool[{request_model_name}, {response_model_name}]):
 
 
     def _generate_main(self) -> str:
-        transport_details = {
-            "stdio": "transport = BlockingStdioTransport()",
-            "google_pubsub": """
-    project_id = "YOUR_GCP_PROJECT_ID"  # Replace
-    mcp_subscription_id = "YOUR_MCP_PUBSUB_SUBSCRIPTION"  # Replace
-    agent_topic_id = "YOUR_AGENT_PUBSUB_TOPIC"  # Replace
-    transport = GooglePubSubTransport(
-        project_id=project_id,
-        mcp_subscription_id=mcp_subscription_id,
-        agent_topic_id=agent_topic_id,
-    )"""
-        }
-        transport_config = transport_details.get(self.transport, "transport = BlockingStdioTransport() # Default or unrecognized transport")
-        if self.transport not in transport_details:
+        main_block = _MAIN_BLOCKS.get(self.transport)
+        if main_block is None:
             logger.warning(f"Unsupported transport '{self.transport}'. Defaulting to Stdio.")
-
-        return f"""
-def main():
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    logger.info("Starting MCP server...")
-
-{transport_config}
-
-    # Assuming 'app' is the Server instance, defined globally after imports.
-    # Resources and Tools are registered to 'app' using decorators.
-    app.serve(transport=transport)
-
-if __name__ == "__main__":
-    main()
-"""
+            main_block = _DEFAULT_MAIN_BLOCK
+        return main_block
 
     def generate_llms_txt(self, output_dir_str: str) -> bool:
         logger.info("Generating llms.txt content...")
         # Ensure model name map is fresh if called standalone
         if not self._model_name_map: self._prepare_model_name_map()
+        self._prepare_operation_meta() # parser.operations may have changed since the last generate()
 
         content_lines = [
             "This document describes the tools and resources available through an MCP server, generated from an OpenAPI specification.",
@@ -535,12 +652,12 @@ if __name__ == "__main__":
 
         # Resources
         content_lines.append("Available Resources (for querying data, typically via GET):")
-        resource_ops = [op for op in self.parser.operations if op.method == HttpMethod.GET]
+        resource_ops = self._resource_ops
         if not resource_ops:
             content_lines.append("  No resources (GET operations) defined.")
         else:
             for op in resource_ops:
-                res_path = f"{self.mount_path}/{op.operation_id}" if self.mount_path else op.operation_id
+                res_path = self._op_meta[id(op)]["resource_path"]
                 content_lines.append(f"\nResource Path (for GET requests): {res_path}")
                 if op.summary: content_lines.append(f"  Summary: {op.summary}")
 
@@ -550,9 +667,8 @@ if __name__ == "__main__":
 
                 if op.parameters:
                     content_lines.append("  Query Parameters (passed in request payload):")
-                    for param in op.parameters: # Assuming all params for GET resource are query params
+                    for param, _, p_type in self._op_meta[id(op)]["sanitized_params"]: # Assuming all params for GET resource are query params
                         if param.location == ParameterLocation.QUERY: # Only list query for resource payload
-                            p_type = self._map_openapi_type_to_pydantic(param.type, is_optional=not param.required)
                             req_opt = "required" if param.required else "optional"
                             desc = f" - {param.description}" if param.description else ""
                             content_lines.append(f"    - {param.name} (type: {p_type}, {req_opt}){desc}")
@@ -562,7 +678,7 @@ if __name__ == "__main__":
 
         # Tools
         content_lines.append("Available Tools (for actions/commands):")
-        tool_ops = [op for op in self.parser.operations if op.method != HttpMethod.GET]
+        tool_ops = self._tool_ops
         if not tool_ops:
             content_lines.append("  No tools (non-GET operations) defined.")
         else:
@@ -577,12 +693,13 @@ if __name__ == "__main__":
                     input_model_str = self._map_openapi_type_to_pydantic(op.request_body_schema.type)
                 content_lines.append(f"  Input Model (for tool argument `arg`): {input_model_str}")
 
-                # Add info about other parameters (path, query, header) if any
-                other_params = [p for p in op.parameters if p.location != ParameterLocation.BODY] # Body handled by input model
-                if other_params:
+                # Add info about other parameters (path, query, header) if any.
+                # The request body never shows up in op.parameters (it is op.request_body_schema, the input model),
+                # so there is nothing to filter out: list the cached parameters in a single pass.
+                sanitized_params = self._op_meta[id(op)]["sanitized_params"]
+                if sanitized_params:
                     content_lines.append("  Additional Parameters (contextual, e.g. for URL path or query if not in input model):")
-                    for param in other_params:
-                        p_type = self._map_openapi_type_to_pydantic(param.type, is_optional=not param.required)
+                    for param, _, p_type in sanitized_params:
                         req_opt = "required" if param.required else "optional"
                         desc = f" - {param.description}" if param.description else ""
                         content_lines.append(f"    - {param.name} ({param.location.value}, type: {p_type}, {req_opt}){desc}")
@@ -597,8 +714,9 @@ if __name__ == "__main__":
             output_dir = Path(output_dir_str)
             output_dir.mkdir(parents=True, exist_ok=True)
             llms_txt_path = output_dir / "llms.txt"
-            with open(llms_txt_path, "w") as f:
-                f.write("\n".join(content_lines))
+            # Stream the lines through a large buffer rather than joining them into one big string first
+            with open(llms_txt_path, "w", buffering=1 << 20) as f:
+                f.writelines(line + "\n" for line in content_lines)
             logger.info(f"llms.txt successfully generated at {llms_txt_path}")
             return True
         except Exception as e:
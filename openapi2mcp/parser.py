@@ -1,13 +1,53 @@
 import json
 import logging
 import re
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try: # Optional: much faster JSON decoding for large specs
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Turns a path template into an operationId fragment: "/pets/{petId}" -> "_pets_petId"
+_PATH_TO_OPERATION_ID_TABLE = str.maketrans({"/": "_", "{": None, "}": None})
+
+# libyaml's CSafeLoader is several times faster than the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader) if yaml is not None else None
+
+# Local pointer prefix used by nearly every $ref in a spec
+_COMPONENT_SCHEMA_REF_PREFIX = "#/components/schemas/"
+_COMPONENT_SCHEMA_REF_PREFIX_LEN = len(_COMPONENT_SCHEMA_REF_PREFIX)
+
+# OpenAPI types whose Python hint depends only on (type, format)
+_SCALAR_OAS_TYPES = frozenset({"string", "integer", "number", "boolean"})
+
+# (type, format) -> Python type hint; (type, None) is the fallback for formats not listed
+_PRIMITIVE_TYPE_MAP: Dict[Tuple[str, Optional[str]], str] = {
+    ("string", "date-time"): "datetime",
+    ("string", "date"): "date",
+    ("string", "email"): "str", # Pydantic's EmailStr can be used by generator
+    ("string", "binary"): "bytes", # e.g. for file uploads
+    ("string", None): "str",
+    ("integer", None): "int",
+    ("number", None): "float",
+    ("boolean", None): "bool",
+}
+
+# Compiled once instead of going through re's pattern cache on every call
+_SCHEMA_REF_RE = re.compile(r"^#/components/schemas/([^/]+)$")
+_NON_IDENTIFIER_CHAR_RE = re.compile(r"[^0-9a-zA-Z_]")
+
 
 class OpenAPIParserError(Exception):
     """Custom exception for OpenAPI parsing errors."""
@@ -25,6 +65,13 @@ class HttpMethod(Enum):
     HEAD = "head"
 
 
+# Success codes probed directly, in priority order, before falling back to the first 2xx response
+_PREFERRED_SUCCESS_CODES = ("200", "201", "204")
+
+# Path-item keys that are operations, mapped to their enum member; everything else ("parameters", "summary", "x-...") is skipped
+_METHOD_FROM_LOWER: Dict[str, HttpMethod] = {m.value: m for m in HttpMethod}
+
+
 class ParameterLocation(Enum):
     PATH = "path"
     QUERY = "query"
@@ -32,7 +79,7 @@ class ParameterLocation(Enum):
     COOKIE = "cookie"
 
 
-@dataclass
+@dataclass(slots=True)
 class Parameter:
     name: str
     location: ParameterLocation
@@ -40,18 +87,30 @@ class Parameter:
     required: bool
     description: Optional[str] = None
 
+    @classmethod
+    def from_openapi(cls, param_def: Dict[str, Any], type_str: str) -> "Parameter":
+        """Builds a Parameter from a resolved OpenAPI parameter object and its already mapped type."""
+        get = param_def.get
+        return cls(param_def["name"], ParameterLocation(param_def["in"]), type_str, get("required", False), get("description"))
+
 
-@dataclass
+@dataclass(slots=True)
 class Schema:
     name: str
     type: str
     properties: Dict[str, Any] = field(default_factory=dict)
     required_properties: List[str] = field(default_factory=list)
     description: Optional[str] = None
-    raw_schema: Dict[str, Any] = field(default_factory=dict)
+    raw_schema: Dict[str, Any] = field(default_factory=dict) # Resolved definition; shared with the spec, not a copy
+    original_ref_schema: Optional[Dict[str, Any]] = None # The pre-resolution {'$ref': ...} definition, if it was a ref
+    # O(1) membership view of required_properties, which keeps the spec's order
+    required_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        self.required_set = frozenset(self.required_properties)
 
-@dataclass
+
+@dataclass(slots=True)
 class Operation:
     operation_id: str
     method: HttpMethod
@@ -68,18 +127,23 @@ class OpenAPIParser:
     def __init__(self):
         self.schemas: Dict[str, Schema] = {}
         self.operations: List[Operation] = []
-        self._visited_refs: Set[str] = set()
+        self._parsing: Set[str] = set() # Sanitized names of schemas currently being parsed (cycle detection)
+        self._ref_cache: Dict[Tuple[int, str], Dict[str, Any]] = {} # (id(spec), ref) -> fully resolved target
+        self._component_schemas: Dict[str, Any] = {} # Raw components.schemas of the current spec
+        self._type_cache: Dict[Union[str, tuple], str] = {} # $ref string or (type, format) of scalar leaves -> Python type hint
+        self._name_cache: Dict[str, str] = {} # Raw schema name -> sanitized name
+        self._ref_parts_cache: Dict[str, Tuple[str, ...]] = {} # Generic JSON pointer -> path segments
 
     def parse_file(self, filepath: Path) -> None:
         """Parses an OpenAPI specification file (JSON or YAML)."""
         try:
-            with open(filepath, "r") as f:
+            with open(filepath, "rb") as f: # Both loaders detect the encoding themselves
                 if filepath.suffix in (".yaml", ".yml"):
-                    import yaml
-
-                    spec = yaml.safe_load(f)
+                    if yaml is None:
+                        raise OpenAPIParserError("PyYAML is required to parse YAML specifications.")
+                    spec = yaml.load(f, Loader=_YAML_LOADER)
                 elif filepath.suffix == ".json":
-                    spec = json.load(f)
+                    spec = orjson.loads(f.read()) if orjson is not None else json.load(f)
                 else:
                     raise OpenAPIParserError(
                         f"Unsupported file format: {filepath.suffix}. Please use JSON or YAML."
@@ -92,35 +156,101 @@ class OpenAPIParser:
 
     def _parse_spec(self, spec: Dict[str, Any]) -> None:
         """Parses the OpenAPI specification content."""
-        if "components" in spec and "schemas" in spec["components"]:
-            for schema_name, schema_def in spec["components"]["schemas"].items():
-                self._parse_schema(schema_name, schema_def, spec)
+        self._ref_cache = {} # Resolved targets are only valid for the spec they came from
+        self._component_schemas = spec.get("components", {}).get("schemas") or {}
+        for schema_name in self._component_schema_order():
+            self._parse_schema(schema_name, self._component_schemas[schema_name], spec)
 
         if "paths" in spec:
             for path, path_item in spec["paths"].items():
                 self._parse_path(path, path_item, spec)
 
-    def _resolve_ref(self, ref: str, spec: Dict[str, Any]) -> Dict[str, Any]:
-        """Resolves a JSON reference string."""
+    def _component_schema_order(self) -> List[str]:
+        """Orders component schemas leaf-first, so a referenced schema is parsed before its referrers.
+
+        Depth-first post-order over declaration order: this is the order the recursive parse already
+        produced, so generated models keep their position. Back-edges of reference cycles are skipped
+        and left to _parse_schema's cycle handling.
+        """
+        component_schemas = self._component_schemas
+        deps: Dict[str, List[str]] = {}
+        for schema_name, schema_def in component_schemas.items():
+            found: Dict[str, None] = {} # Ordered set of referenced raw names
+            self._collect_schema_refs(schema_def, found)
+            deps[schema_name] = [dep for dep in found if dep != schema_name and dep in component_schemas]
+
+        order: List[str] = []
+        seen: Set[str] = set()
+        for root in component_schemas:
+            if root in seen:
+                continue
+            seen.add(root)
+            stack = [(root, iter(deps[root]))]
+            while stack:
+                schema_name, pending = stack[-1]
+                for dep in pending:
+                    if dep not in seen:
+                        seen.add(dep)
+                        stack.append((dep, iter(deps[dep])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(schema_name)
+        return order
+
+    def _collect_schema_refs(self, node: Any, found: Dict[str, None]) -> None:
+        """Records the raw names of all '#/components/schemas/Name' refs found anywhere under node, in order."""
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith(_COMPONENT_SCHEMA_REF_PREFIX):
+                found[ref[_COMPONENT_SCHEMA_REF_PREFIX_LEN:]] = None
+            for value in node.values():
+                if isinstance(value, (dict, list)):
+                    self._collect_schema_refs(value, found)
+        elif isinstance(node, list):
+            for item in node:
+                self._collect_schema_refs(item, found)
+
+    def _resolve_ref(self, ref: str, spec: Dict[str, Any], visited: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Resolves a JSON reference string.
+
+        `visited` holds the refs of the current ref -> ref chain only; it is created per top-level call.
+        """
         if not ref.startswith("#/"):
             raise OpenAPIParserError(f"Unsupported reference format: {ref}")
 
-        if ref in self._visited_refs:
-            # Attempt to return already parsed schema if available to avoid infinite recursion on circular refs
-            # This might need more sophisticated handling for complex circular dependencies
+        if visited and ref in visited:
+            # The chain of nested refs came back to itself.
+            # Return a marker if the target schema was already parsed, otherwise the chain can never resolve.
             schema_name = self._extract_schema_name(ref)
             if schema_name and schema_name in self.schemas:
                  # Return a minimal representation or a marker that this is a circular ref
                 return {"type": "object", "x-circular-ref": schema_name}
-            # Fallback or raise error if not handled well
-            # For now, we'll proceed, but this is a point of potential infinite recursion
-            # logger.warning(f"Re-visiting ref: {ref}. Potential circular dependency.")
-            pass # Allow re-visiting for now, simple cycle breaking above.
-
-        self._visited_refs.add(ref)
-
-        parts = ref[2:].split("/")
-        current = spec
+            raise OpenAPIParserError(f"Circular reference: {ref}")
+
+        # Keyed by the spec object too: a ref only means something relative to the document it is resolved in
+        cache_key = (id(spec), ref)
+        cached = self._ref_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if visited is None:
+            visited = set()
+        visited.add(ref)
+
+        schema_ref_name = ref[_COMPONENT_SCHEMA_REF_PREFIX_LEN:] if ref.startswith(_COMPONENT_SCHEMA_REF_PREFIX) else None
+        if schema_ref_name and "/" not in schema_ref_name:
+            # Fast path for the common '#/components/schemas/Name' pointer: index directly instead of walking parts
+            try:
+                current = spec["components"]["schemas"][schema_ref_name]
+            except (KeyError, TypeError):
+                raise OpenAPIParserError(f"Could not resolve reference: {ref}")
+            parts = ()
+        else:
+            parts = self._ref_parts_cache.get(ref)
+            if parts is None:
+                parts = self._ref_parts_cache[ref] = tuple(ref[2:].split("/"))
+            current = spec
         for part in parts:
             if isinstance(current, dict) and part in current:
                 current = current[part]
@@ -141,226 +271,176 @@ class OpenAPIParser:
 
         if "$ref" in current: # Handle nested refs
             nested_ref_val = current["$ref"]
-            resolved_nested = self._resolve_ref(nested_ref_val, spec)
-            self._visited_refs.remove(ref) # Remove parent ref after resolving child
+            resolved_nested = self._resolve_ref(nested_ref_val, spec, visited)
+            if "x-circular-ref" not in resolved_nested: # Never cache the cycle-breaking placeholder
+                self._ref_cache[cache_key] = resolved_nested
             return resolved_nested
 
-        self._visited_refs.remove(ref) # remove after successful resolution
+        self._ref_cache[cache_key] = current
         return current
 
     def _parse_schema(
         self, schema_name: str, schema_def: Dict[str, Any], spec: Dict[str, Any]
     ) -> Schema:
         """Parses a schema definition, handling references."""
-        original_ref = f"#/components/schemas/{schema_name}" # Assuming schema_name is raw here
-
-        # Sanitize schema_name early for consistent dictionary keys
-        clean_schema_name_for_dict_key = self._sanitize_name(schema_name)
+        # Sanitize schema_name early for consistent dictionary keys.
+        # Every $ref to an already parsed schema comes through here, so sanitized names are cached.
+        clean_schema_name_for_dict_key = self._name_cache.get(schema_name)
+        if clean_schema_name_for_dict_key is None:
+            clean_schema_name_for_dict_key = self._name_cache[schema_name] = self._sanitize_name(schema_name)
 
-        if original_ref in self._visited_refs and clean_schema_name_for_dict_key in self.schemas:
+        if clean_schema_name_for_dict_key in self.schemas:
             return self.schemas[clean_schema_name_for_dict_key]
 
-        self._visited_refs.add(original_ref)
+        if clean_schema_name_for_dict_key in self._parsing:
+            # Circular reference back into a schema that is still being parsed.
+            # Referrers only need its name, so hand back a lightweight proxy; the real Schema is stored when done.
+            return Schema(name=clean_schema_name_for_dict_key, type=clean_schema_name_for_dict_key)
+        self._parsing.add(clean_schema_name_for_dict_key)
+        try:
+            current_schema_def = schema_def
+            if "$ref" in current_schema_def:
+                resolved_schema_def = self._resolve_ref(current_schema_def["$ref"], spec)
+                current_schema_def = resolved_schema_def
+                # If the original schema_def was just a ref, its name might be derived from the ref.
+                # However, schema_name parameter is what was passed from components/schemas key.
+
+            schema_type = current_schema_def.get("type", "object")
+            properties = {}
+            required_properties = current_schema_def.get("required", [])
+            description = current_schema_def.get("description")
+
+            if "properties" in current_schema_def:
+                # Bound once: this loop runs for every property of every schema
+                resolve_ref = self._resolve_ref
+                ensure_component_parsed = self._ensure_component_parsed
+                get_python_type = self._get_python_type
+                warn = logger.warning
+                for prop_name, prop_def in current_schema_def["properties"].items():
+                    if "$ref" in prop_def:
+                        ref_path = prop_def["$ref"]
+                        try:
+                            ref_schema_name = ensure_component_parsed(ref_path, spec) # Gets sanitized name
+                            if ref_schema_name:
+                                properties[prop_name] = {"type": ref_schema_name, "is_ref": True} # Use sanitized name
+                            else:
+                                properties[prop_name] = get_python_type(resolve_ref(ref_path, spec))
+                        except OpenAPIParserError as e:
+                            warn(f"Could not resolve reference {ref_path} for property {prop_name}: {e}")
+                            properties[prop_name] = {"type": "any", "description": f"Unresolved reference: {ref_path}"}
+                    else:
+                        properties[prop_name] = get_python_type(prop_def)
 
-        if clean_schema_name_for_dict_key in self.schemas:
-             self._visited_refs.remove(original_ref)
-             return self.schemas[clean_schema_name_for_dict_key]
-
-        current_schema_def = schema_def
-        if "$ref" in current_schema_def:
-            resolved_schema_def = self._resolve_ref(current_schema_def["$ref"], spec)
-            current_schema_def = resolved_schema_def
-            # If the original schema_def was just a ref, its name might be derived from the ref.
-            # However, schema_name parameter is what was passed from components/schemas key.
-
-        schema_type = current_schema_def.get("type", "object")
-        properties = {}
-        required_properties = current_schema_def.get("required", [])
-        description = current_schema_def.get("description")
-
-        if "properties" in current_schema_def:
-            for prop_name, prop_def in current_schema_def["properties"].items():
-                if "$ref" in prop_def:
-                    ref_path = prop_def["$ref"]
+            elif schema_type == "array" and "items" in current_schema_def:
+                items_def = current_schema_def["items"]
+                if "$ref" in items_def:
+                    ref_path = items_def["$ref"]
                     try:
-                        resolved_prop_def = self._resolve_ref(ref_path, spec)
-                        ref_schema_name = self._extract_schema_name(ref_path) # Gets sanitized name
+                        ref_schema_name = self._ensure_component_parsed(ref_path, spec) # Gets sanitized name
                         if ref_schema_name:
-                            if ref_schema_name not in self.schemas:
-                                if ref_path.startswith("#/components/schemas/"):
-                                    raw_ref_schema_name = ref_path.split('/')[-1] # Get raw name for spec lookup
-                                    if spec.get("components", {}).get("schemas", {}).get(raw_ref_schema_name):
-                                       self._parse_schema(raw_ref_schema_name, spec["components"]["schemas"][raw_ref_schema_name], spec)
-                                    else:
-                                        logger.warning(f"Could not find definition for referenced schema: {raw_ref_schema_name}")
-                                        properties[prop_name] = {"type": "object", "description": f"Unresolved reference: {ref_path}"}
-                                        continue
-                                else:
-                                    logger.warning(f"Unsupported reference type for property {prop_name}: {ref_path}")
-                                    properties[prop_name] = {"type": "object", "description": f"Complex reference: {ref_path}"}
-                                    continue
-                            properties[prop_name] = {"type": ref_schema_name, "is_ref": True} # Use sanitized name
+                            schema_type = f"List[{ref_schema_name}]" # Use sanitized name
                         else:
-                            properties[prop_name] = self._get_python_type(resolved_prop_def)
+                            item_type_info = self._get_python_type(self._resolve_ref(ref_path, spec))
+                            schema_type = f"List[{self._unwrap_type(item_type_info)}]"
+
                     except OpenAPIParserError as e:
-                        logger.warning(f"Could not resolve reference {ref_path} for property {prop_name}: {e}")
-                        properties[prop_name] = {"type": "any", "description": f"Unresolved reference: {ref_path}"}
+                        logger.warning(f"Could not resolve reference {ref_path} for array items: {e}")
+                        schema_type = "List[Any]"
                 else:
-                    properties[prop_name] = self._get_python_type(prop_def)
-
-        elif schema_type == "array" and "items" in current_schema_def:
-            items_def = current_schema_def["items"]
-            if "$ref" in items_def:
-                ref_path = items_def["$ref"]
-                try:
-                    resolved_items_def = self._resolve_ref(ref_path, spec)
-                    ref_schema_name = self._extract_schema_name(ref_path) # Gets sanitized name
-                    if ref_schema_name:
-                        if ref_schema_name not in self.schemas :
-                             if ref_path.startswith("#/components/schemas/"):
-                                raw_ref_schema_name = ref_path.split('/')[-1]
-                                if spec.get("components", {}).get("schemas", {}).get(raw_ref_schema_name):
-                                    self._parse_schema(raw_ref_schema_name, spec["components"]["schemas"][raw_ref_schema_name], spec)
-                                else:
-                                    logger.warning(f"Could not find definition for array item's referenced schema: {raw_ref_schema_name}")
-                                    schema_type = f"List[Any]"
-else:
-                                    logger.warning(f"Unsupported reference type for array items: {ref_path}")
-                                    schema_type = f"List[Any]"
-                        schema_type = f"List[{ref_schema_name}]" # Use sanitized name
-                    else:
-                        item_type_info = self._get_python_type(resolved_items_def)
-                        schema_type = f"List[{item_type_info.get('type', 'Any') if isinstance(item_type_info, dict) else item_type_info}]"
-
-                except OpenAPIParserError as e:
-                    logger.warning(f"Could not resolve reference {ref_path} for array items: {e}")
-                    schema_type = "List[Any]"
-            else:
-                item_type_info = self._get_python_type(items_def)
-                schema_type = f"List[{item_type_info.get('type', 'Any') if isinstance(item_type_info, dict) else item_type_info}]"
-
-        final_schema_name = self._sanitize_name(schema_name) # Sanitize the original schema_name for the Schema object
-
-        schema = Schema(
-            name=final_schema_name,
-            type=schema_type if schema_type != "object" or not properties else final_schema_name,
-            properties=properties,
-            required_properties=required_properties,
-            description=description,
-            raw_schema=current_schema_def,
-        )
-        self.schemas[final_schema_name] = schema # Store with sanitized name
-
-        if original_ref in self._visited_refs:
-            self._visited_refs.remove(original_ref)
+                    item_type_info = self._get_python_type(items_def)
+                    schema_type = f"List[{self._unwrap_type(item_type_info)}]"
+
+            final_schema_name = clean_schema_name_for_dict_key # The sanitized original schema_name, for the Schema object
+
+            schema = Schema(
+                name=final_schema_name,
+                type=schema_type if schema_type != "object" or not properties else final_schema_name,
+                properties=properties,
+                required_properties=required_properties,
+                description=description,
+                raw_schema=current_schema_def,
+                original_ref_schema=schema_def if current_schema_def is not schema_def else None,
+            )
+            self.schemas[final_schema_name] = schema # Store with sanitized name
+        finally:
+            # Also on error, so a failed parse does not leave the name looking in progress
+            self._parsing.discard(clean_schema_name_for_dict_key)
         return schema
 
+    def _ensure_component_parsed(self, ref_path: str, spec: Dict[str, Any]) -> Optional[str]:
+        """Makes sure the component schema a '#/components/schemas/Name' ref points to is parsed.
+
+        Returns its sanitized name, or None if ref_path is not a component-schema ref.
+        Raises OpenAPIParserError if the referenced schema is not defined.
+        """
+        ref_schema_name = self._extract_schema_name(ref_path) # Sanitized
+        if ref_schema_name and ref_schema_name not in self.schemas:
+            raw_ref_schema_name = ref_path.rpartition('/')[2] # Raw name for spec lookup
+            raw_ref_schema_def = self._component_schemas.get(raw_ref_schema_name)
+            if raw_ref_schema_def is None:
+                raise OpenAPIParserError(f"Could not find definition for referenced schema: {raw_ref_schema_name}")
+            self._parse_schema(raw_ref_schema_name, raw_ref_schema_def, spec)
+        return ref_schema_name
+
     def _parse_path(
         self, path: str, path_item: Dict[str, Any], spec: Dict[str, Any]
     ) -> None:
         """Parses a path item and its operations."""
+        sanitize_name = self._sanitize_name
+        resolve_ref = self._resolve_ref
+        parse_parameter = self._parse_parameter
+        resolve_content_schema = self._resolve_content_schema
+        append_operation = self.operations.append
+        clean_path = None # operationId fragment for this path, built on the first operation that lacks an operationId
         for method_str, op_def in path_item.items():
-            if method_str.upper() not in HttpMethod.__members__:
+            method = _METHOD_FROM_LOWER.get(method_str.lower())
+            if method is None:
                 continue
 
-            method = HttpMethod(method_str.lower())
             operation_id = op_def.get("operationId")
             if not operation_id:
-                clean_path = path.replace("/", "_").replace("{", "").replace("}", "")
+                if clean_path is None:
+                    clean_path = path.translate(_PATH_TO_OPERATION_ID_TABLE)
                 operation_id = f"{method.value}{clean_path}"
                 logger.info(f"Synthesized operationId for {method.value.upper()} {path}: {operation_id}")
 
-            sanitized_op_id = self._sanitize_name(operation_id)
-
-            parameters: List[Parameter] = []
-            # Process path-level parameters first
-            path_level_params_defs = path_item.get("parameters", [])
-            for param_def_or_ref in path_level_params_defs:
-                param_def = self._resolve_ref(param_def_or_ref["$ref"], spec) if "$ref" in param_def_or_ref else param_def_or_ref
-                parameters.append(self._parse_parameter(param_def, spec))
-
-            # Process operation-level parameters, allowing override by name and location
-            op_level_params_defs = op_def.get("parameters", [])
-            processed_op_params: List[Parameter] = []
-            for param_def_or_ref in op_level_params_defs:
-                param_def = self._resolve_ref(param_def_or_ref["$ref"], spec) if "$ref" in param_def_or_ref else param_def_or_ref
-                parsed_param = self._parse_parameter(param_def, spec)
-
-                # Check if this parameter (by name and location) was already defined at path level
-                overridden = False
-                for i, path_param in enumerate(parameters):
-                    if path_param.name == parsed_param.name and path_param.location == parsed_param.location:
-                        parameters[i] = parsed_param # Override with more specific definition
-                        overridden = True
-                        break
-                if not overridden:
-                    processed_op_params.append(parsed_param) # Add as new parameter for this operation
+            sanitized_op_id = sanitize_name(operation_id)
 
-            parameters.extend(processed_op_params) # Add any new (non-overriding) operation parameters
+            # Parameters keyed by (name, location). Path-level ones go in first; an operation-level parameter
+            # with the same key overrides it in place, new ones are appended in order.
+            merged_params: Dict[Tuple[str, ParameterLocation], Parameter] = {}
+            for param_def_or_ref in (*path_item.get("parameters", ()), *op_def.get("parameters", ())):
+                param_def = resolve_ref(param_def_or_ref["$ref"], spec) if "$ref" in param_def_or_ref else param_def_or_ref
+                parsed_param = parse_parameter(param_def, spec)
+                merged_params[(parsed_param.name, parsed_param.location)] = parsed_param
+            parameters = list(merged_params.values())
 
 
             request_body_schema: Optional[Schema] = None
             if "requestBody" in op_def:
-                request_body_def_or_ref = op_def["requestBody"]
-                request_body_def = self._resolve_ref(request_body_def_or_ref["$ref"], spec) if "$ref" in request_body_def_or_ref else request_body_def_or_ref
-
-                content = request_body_def.get("content", {})
-                json_content = content.get("application/json", content.get("*/*"))
-                if json_content and "schema" in json_content:
-                    rb_schema_def_or_ref = json_content["schema"]
-                    rb_schema_def = self._resolve_ref(rb_schema_def_or_ref["$ref"], spec) if "$ref" in rb_schema_def_or_ref else rb_schema_def_or_ref
-
-                    ref_path = rb_schema_def_or_ref.get("$ref") if isinstance(rb_schema_def_or_ref, dict) else None
-
-                    if ref_path:
-                        ref_schema_name = self._extract_schema_name(ref_path) # Sanitized
-                        if ref_schema_name:
-                            if ref_schema_name not in self.schemas:
-                                raw_ref_name = ref_path.split('/')[-1] # For spec lookup
-                                self._parse_schema(raw_ref_name, self._resolve_ref(ref_path, spec), spec) # _parse_schema handles storing by sanitized name
-                            request_body_schema = self.schemas[ref_schema_name]
-                        else:
-                            synthetic_name = self._sanitize_name(f"{sanitized_op_id}_RequestBody")
-                            request_body_schema = self._parse_schema(synthetic_name, rb_schema_def, spec)
-                    else:
-                        synthetic_name = self._sanitize_name(f"{sanitized_op_id}_RequestBody")
-                        request_body_schema = self._parse_schema(synthetic_name, rb_schema_def, spec)
-
+                request_body_schema = resolve_content_schema(op_def["requestBody"], spec, sanitized_op_id, "_RequestBody")
 
             response_schema: Optional[Schema] = None
             if "responses" in op_def:
+                responses = op_def["responses"]
                 success_response_def_or_ref = None
-                for code, resp_def_ref in op_def["responses"].items():
-                    if code.startswith("2"): # Prioritize 2xx responses
+                # Nearly every spec uses one of these; probe them directly before scanning all codes
+                for code in _PREFERRED_SUCCESS_CODES:
+                    resp_def_ref = responses.get(code)
+                    if type(resp_def_ref) is dict:
                         success_response_def_or_ref = resp_def_ref
                         break
+                else:
+                    for code, resp_def_ref in responses.items():
+                        # YAML loads unquoted status codes (200:) as ints
+                        if str(code)[:1] == "2" and type(resp_def_ref) is dict: # Prioritize 2xx responses
+                            success_response_def_or_ref = resp_def_ref
+                            break
 
                 if success_response_def_or_ref:
-                    success_response_def = self._resolve_ref(success_response_def_or_ref["$ref"], spec) if "$ref" in success_response_def_or_ref else success_response_def_or_ref
-
-                    content = success_response_def.get("content", {})
-                    json_content = content.get("application/json", content.get("*/*"))
-                    if json_content and "schema" in json_content:
-                        resp_schema_def_or_ref = json_content["schema"]
-                        resp_schema_def = self._resolve_ref(resp_schema_def_or_ref["$ref"], spec) if "$ref" in resp_schema_def_or_ref else resp_schema_def_or_ref
+                    response_schema = resolve_content_schema(success_response_def_or_ref, spec, sanitized_op_id, "_ResponseBody")
 
-                        ref_path = resp_schema_def_or_ref.get("$ref") if isinstance(resp_schema_def_or_ref, dict) else None
-
-                        if ref_path:
-                            ref_schema_name = self._extract_schema_name(ref_path) # Sanitized
-                            if ref_schema_name:
-                                if ref_schema_name not in self.schemas:
-                                     raw_ref_name = ref_path.split('/')[-1]
-                                     self._parse_schema(raw_ref_name, self._resolve_ref(ref_path, spec), spec)
-                                response_schema = self.schemas[ref_schema_name]
-                            else:
-                                synthetic_name = self._sanitize_name(f"{sanitized_op_id}_ResponseBody")
-                                response_schema = self._parse_schema(synthetic_name, resp_schema_def, spec)
-                        else:
-                            synthetic_name = self._sanitize_name(f"{sanitized_op_id}_ResponseBody")
-                            response_schema = self._parse_schema(synthetic_name, resp_schema_def, spec)
-
-            self.operations.append(
+            append_operation(
                 Operation(
                     operation_id=sanitized_op_id,
                     method=method,
@@ -374,59 +454,69 @@ else:
                 )
             )
 
+    def _resolve_content_schema(
+        self, container_def_or_ref: Dict[str, Any], spec: Dict[str, Any], sanitized_op_id: str, synthetic_suffix: str
+    ) -> Optional[Schema]:
+        """Returns the Schema of a requestBody or response object's content, or None if it declares none.
+
+        A component $ref maps to that component's Schema; an inline schema is parsed under a synthetic
+        name built from the operation id and `synthetic_suffix` ("_RequestBody" / "_ResponseBody").
+        """
+        container_ref = container_def_or_ref.get("$ref")
+        container_def = self._resolve_ref(container_ref, spec) if container_ref else container_def_or_ref
+
+        content = container_def.get("content", {})
+        # Fallbacks are looked up only when the preferred media type is absent
+        media = content.get("application/json")
+        if media is None:
+            media = content.get("*/*")
+            if media is None:
+                media = content.get("application/octet-stream")
+        if not media or "schema" not in media:
+            return None
+
+        schema_def_or_ref = media["schema"]
+        ref_path = schema_def_or_ref.get("$ref") if isinstance(schema_def_or_ref, dict) else None
+        if ref_path:
+            ref_schema_name = self._ensure_component_parsed(ref_path, spec) # Sanitized
+            if ref_schema_name:
+                return self.schemas[ref_schema_name]
+            schema_def = self._resolve_ref(ref_path, spec)
+        else:
+            schema_def = schema_def_or_ref
+
+        synthetic_name = self._sanitize_name(f"{sanitized_op_id}{synthetic_suffix}")
+        return self._parse_schema(synthetic_name, schema_def, spec)
+
     def _parse_parameter(
         self, param_def: Dict[str, Any], spec: Dict[str, Any]
     ) -> Parameter:
         """Parses a parameter definition. Assumes param_def is already resolved if it was a ref."""
-        name = param_def["name"]
-        location = ParameterLocation(param_def["in"])
-        required = param_def.get("required", False)
-        description = param_def.get("description")
-
         param_schema_or_ref = param_def.get("schema")
         param_type = "Any"
+        schemas = self.schemas
 
         if param_schema_or_ref:
-            param_schema = self._resolve_ref(param_schema_or_ref["$ref"], spec) if "$ref" in param_schema_or_ref else param_schema_or_ref
-
             ref_path = param_schema_or_ref.get("$ref") if isinstance(param_schema_or_ref, dict) else None
+            ref_schema_name = self._ensure_component_parsed(ref_path, spec) if ref_path else None # Sanitized
 
-            if ref_path: # Check if the schema itself was a reference
-                ref_schema_name = self._extract_schema_name(ref_path) # Sanitized
-                if ref_schema_name:
-                    if ref_schema_name not in self.schemas:
-                        raw_ref_name = ref_path.split('/')[-1] # For spec lookup
-                        component_schema_def = spec.get("components", {}).get("schemas", {}).get(raw_ref_name)
-                        if component_schema_def:
-                            self._parse_schema(raw_ref_name, component_schema_def, spec)
-                        else:
-                            logger.warning(f"Could not find schema component for parameter ref {ref_path}. Defaulting type.")
-                            # Attempt to get type from resolved schema if not a component
-                            type_info = self._get_python_type(param_schema) # param_schema is resolved_ref here
-                            param_type = type_info.get('type', 'Any') if isinstance(type_info, dict) else type_info
-
-                    # If schema was found and parsed (or already existed), use its sanitized name
-                    if ref_schema_name in self.schemas:
-                         param_type = ref_schema_name # Use the schema's sanitized name as type
-                    # else: it means it was not found in components and type_info was used above
-                else:
-                    type_info = self._get_python_type(param_schema) # param_schema is resolved_ref
-                    param_type = type_info.get('type', 'Any') if isinstance(type_info, dict) else type_info
-            else: # Inline schema definition for the parameter
+            if ref_schema_name and ref_schema_name in schemas:
+                param_type = ref_schema_name # Use the schema's sanitized name as type
+            else: # Inline schema, or a ref to something other than a component schema
+                param_schema = self._resolve_ref(ref_path, spec) if ref_path else param_schema_or_ref
                 type_info = self._get_python_type(param_schema)
-                param_type = type_info.get('type', 'Any') if isinstance(type_info, dict) else type_info
+                param_type = self._unwrap_type(type_info)
         else: # No schema for the parameter (OpenAPI 2.0 style, or simple type)
             type_info = self._get_python_type(param_def)
-            param_type = type_info.get('type', 'Any') if isinstance(type_info, dict) else type_info
+            param_type = self._unwrap_type(type_info)
+
 
+        return Parameter.from_openapi(param_def, param_type)
 
-        return Parameter(
-            name=name,
-            location=location,
-            type=param_type,
-            required=required,
-            description=description,
-        )
+    @staticmethod
+    def _unwrap_type(type_info: Union[str, Dict[str, Any]]) -> str:
+        """Returns the type hint string of a _get_python_type result (inline objects carry it under 'type')."""
+        return type_info.get('type', 'Any') if type(type_info) is dict else type_info
 
     def _get_python_type(self, schema_prop: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
         """Converts OpenAPI schema type to Python type hint. schema_prop is assumed to be resolved."""
@@ -435,44 +525,35 @@ else:
         prop_ref = schema_prop.get("$ref") # Should not happen if schema_prop is resolved, but as a fallback
 
         if prop_ref:
-            ref_name = self._extract_schema_name(prop_ref) # Sanitized
-            return ref_name if ref_name else "Any"
-
-
-        if prop_type == "string":
-            if prop_format == "date-time":
-                return "datetime"
-            elif prop_format == "date":
-                return "date"
-            elif prop_format == "email": # Pydantic's EmailStr can be used by generator
-                return "str"
-            elif prop_format == "binary": # e.g. for file uploads
-                return "bytes"
-            return "str"
-        elif prop_type == "integer":
-            return "int"
-        elif prop_type == "number":
-            if prop_format == "float" or prop_format == "double":
-                return "float"
-            return "float"
-        elif prop_type == "boolean":
-            return "bool"
+            # Keyed by the ref string itself; scalar leaves use (type, format) tuples so the keys never collide
+            python_type = self._type_cache.get(prop_ref)
+            if python_type is None:
+                python_type = self._type_cache[prop_ref] = self._extract_schema_name(prop_ref) or "Any" # Sanitized
+            return python_type
+
+        # OpenAPI 3.1 allows a list of types (e.g. ["string", "null"]); those are unhashable and fall through to "Any"
+        if isinstance(prop_type, str) and prop_type in _SCALAR_OAS_TYPES:
+            # Most properties are plain scalars; resolve each (type, format) pair once per parser
+            type_cache = self._type_cache
+            leaf_key = (prop_type, prop_format)
+            python_type = type_cache.get(leaf_key)
+            if python_type is None:
+                python_type = type_cache[leaf_key] = _PRIMITIVE_TYPE_MAP.get(leaf_key) or _PRIMITIVE_TYPE_MAP[(prop_type, None)]
+            return python_type
         elif prop_type == "array":
             items_schema_or_ref = schema_prop.get("items", {})
-            items_schema = self._resolve_ref(items_schema_or_ref["$ref"], {}) if "$ref" in items_schema_or_ref else items_schema_or_ref # Pass empty spec for resolving item ref if it's not a component ref
-
-            item_type_info = self._get_python_type(items_schema) # Recursive call
-            item_type_str = item_type_info.get('type', 'Any') if isinstance(item_type_info, dict) else str(item_type_info)
-            return f"List[{item_type_str}]"
+            # A $ref item is left unresolved: the recursive call maps it to the referenced schema's name
+            item_type_info = self._get_python_type(items_schema_or_ref) # Recursive call
+            item_type_str = self._unwrap_type(item_type_info)
+            return sys.intern(f"List[{item_type_str}]") # Few distinct container hints per spec; share one object each
         elif prop_type == "object":
             if "additionalProperties" in schema_prop:
                 additional_props_schema_or_ref = schema_prop["additionalProperties"]
-                if isinstance(additional_props_schema_or_ref, dict):
-                    additional_props_schema = self._resolve_ref(additional_props_schema_or_ref["$ref"], {}) if "$ref" in additional_props_schema_or_ref else additional_props_schema_or_ref
-                    additional_prop_type_info = self._get_python_type(additional_props_schema)
-                    additional_prop_type_str = additional_prop_type_info.get('type', 'Any') if isinstance(additional_prop_type_info, dict) else str(additional_prop_type_info)
-                    return f"Dict[str, {additional_prop_type_str}]"
-                elif isinstance(additional_props_schema_or_ref, bool) and additional_props_schema_or_ref:
+                if type(additional_props_schema_or_ref) is dict:
+                    additional_prop_type_info = self._get_python_type(additional_props_schema_or_ref) # A $ref maps to the schema name
+                    additional_prop_type_str = self._unwrap_type(additional_prop_type_info)
+                    return sys.intern(f"Dict[str, {additional_prop_type_str}]")
+                elif additional_props_schema_or_ref is True:
                     return "Dict[str, Any]"
 
             if "properties" in schema_prop:
@@ -488,7 +569,7 @@ else:
 
     def _extract_schema_name(self, ref_path: str) -> Optional[str]:
         """Extracts schema name from a $ref path like '#/components/schemas/MySchema' and sanitizes it."""
-        match = re.match(r"^#/components/schemas/([^/]+)$", ref_path)
+        match = _SCHEMA_REF_RE.match(ref_path)
         if match:
             return self._sanitize_name(match.group(1))
 
@@ -501,19 +582,13 @@ else:
         if not isinstance(name, str): # Ensure name is a string
             name = str(name)
 
-        # Replace invalid characters with underscore
-        name = re.sub(r"[^0-9a-zA-Z_]", "_", name)
-
-        # Remove leading characters until a letter or underscore is found
-        name = re.sub(r"^[^a-zA-Z_]+", "", name)
+        # Replace invalid characters with underscore, then drop leading digits.
+        # After the substitution only [0-9a-zA-Z_] remain, so digits are the only invalid leading chars.
+        name = _NON_IDENTIFIER_CHAR_RE.sub("_", name).lstrip("0123456789")
 
         if not name: # Handle empty string after sanitization
             return "_Schema"
 
-        # If first char is a digit after initial sanitization (e.g. _0_Schema), prepend underscore
-        if name[0].isdigit():
-            name = "_" + name
-
         # Basic check for python keywords (can be expanded)
         # For now, we assume names like 'list', 'dict' are unlikely for top-level schemas
         # but could be for properties. This might need more sophisticated handling if it collides.
@@ -521,4 +596,5 @@ else:
         # For now, let's keep it simple. If 'list' is a schema name, it becomes 'list'.
         # The generator should handle potential keyword clashes for variable names.
 
-        return name
+        # Sanitized names are a small set reused as dict keys and type strings everywhere; share one object each
+        return sys.intern(name)
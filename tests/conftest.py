@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def duplicate_schemas_spec():
+    """Spec with two component schemas of identical shape, for --dedupe-models / dedupe_models."""
+    error_shape = {
+        "type": "object",
+        "properties": {"code": {"type": "integer"}, "message": {"type": "string"}},
+        "required": ["code"],
+    }
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Errors", "version": "1.0"},
+        "paths": {},
+        "components": {
+            "schemas": {
+                "Error": dict(error_shape),
+                "NotFoundError": dict(error_shape),
+            }
+        },
+    }
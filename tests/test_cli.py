@@ -0,0 +1,31 @@
+import json
+
+from click.testing import CliRunner
+
+from openapi2mcp.cli import main
+
+
+def _run_generate(tmp_path, spec, *extra_args):
+    spec_file = tmp_path / "openapi.json"
+    spec_file.write_text(json.dumps(spec))
+    output = tmp_path / "server.py"
+
+    result = CliRunner().invoke(main, ["generate", "-i", str(spec_file), "-o", str(output), *extra_args])
+
+    assert result.exit_code == 0, result.output
+    return output.read_text()
+
+
+def test_generate_with_dedupe_models_aliases_identical_schemas(tmp_path, duplicate_schemas_spec):
+    code = _run_generate(tmp_path, duplicate_schemas_spec, "--dedupe-models")
+
+    assert "class Error(BaseModel):" in code
+    assert "class NotFoundError(BaseModel):" not in code
+    assert "NotFoundError = Error" in code
+
+
+def test_generate_without_dedupe_models_emits_every_schema(tmp_path, duplicate_schemas_spec):
+    code = _run_generate(tmp_path, duplicate_schemas_spec)
+
+    assert "class NotFoundError(BaseModel):" in code
+    assert "NotFoundError = Error" not in code
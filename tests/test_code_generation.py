@@ -0,0 +1,125 @@
+from openapi2mcp.generator import MCPGenerator
+from openapi2mcp.parser import OpenAPIParser
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Docs", "version": "1.0"},
+    "paths": {
+        "/notes": {
+            "get": {
+                "operationId": "listNotes",
+                "summary": 'Lists notes, e.g. """pinned""" ones',
+                "responses": {"200": {"description": "OK"}},
+            },
+            "post": {
+                "operationId": "createNote",
+                "summary": 'Creates a """note"""',
+                "responses": {"201": {"description": "Created"}},
+            },
+        }
+    },
+    "components": {
+        "schemas": {
+            "Note": {
+                "type": "object",
+                "description": 'A note; may contain """quotes"""',
+                "properties": {"text": {"type": "string"}},
+            }
+        }
+    },
+}
+
+
+def test_triple_quotes_in_descriptions_are_escaped(tmp_path):
+    parser = OpenAPIParser()
+    parser._parse_spec(SPEC)
+    output = tmp_path / "server.py"
+
+    assert MCPGenerator(parser).generate(str(output))
+
+    code = output.read_text()
+    compile(code, str(output), "exec")
+    assert 'Resource for: Lists notes, e.g. \\"\\"\\"pinned\\"\\"\\" ones' in code
+    assert 'Tool for: Creates a \\"\\"\\"note\\"\\"\\"' in code
+    assert 'A note; may contain \\"\\"\\"quotes\\"\\"\\"' in code
+
+
+def test_dedupe_models_aliases_identical_schemas(tmp_path, duplicate_schemas_spec):
+    parser = OpenAPIParser()
+    parser._parse_spec(duplicate_schemas_spec)
+    output = tmp_path / "server.py"
+
+    assert MCPGenerator(parser, dedupe_models=True).generate(str(output))
+
+    code = output.read_text()
+    assert "class Error(BaseModel):" in code
+    assert "class NotFoundError(BaseModel):" not in code
+    assert "NotFoundError = Error" in code
+
+
+def test_models_are_not_deduped_by_default(tmp_path, duplicate_schemas_spec):
+    parser = OpenAPIParser()
+    parser._parse_spec(duplicate_schemas_spec)
+    output = tmp_path / "server.py"
+
+    assert MCPGenerator(parser).generate(str(output))
+
+    code = output.read_text()
+    assert "class Error(BaseModel):" in code
+    assert "class NotFoundError(BaseModel):" in code
+
+
+COLLIDING_IDS_SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1.0"},
+    "paths": {
+        "/a": {
+            "get": {
+                "operationId": "get-pet",
+                "parameters": [{"name": "x", "in": "query", "schema": {"type": "integer"}}],
+                "responses": {"200": {"description": "OK"}},
+            }
+        },
+        "/b": {
+            "get": {
+                "operationId": "get_pet",
+                "parameters": [{"name": "y", "in": "query", "schema": {"type": "string"}}],
+                "responses": {"200": {"description": "OK"}},
+            }
+        },
+    },
+}
+
+
+def test_operations_with_colliding_sanitized_ids_keep_their_own_parameters(tmp_path):
+    parser = OpenAPIParser()
+    parser._parse_spec(COLLIDING_IDS_SPEC)
+    output = tmp_path / "server.py"
+
+    assert MCPGenerator(parser).generate(str(output))
+
+    code = output.read_text()
+    assert code.count("x: Optional[int] = ctx.payload.get('x')") == 1
+    assert code.count("y: Optional[str] = ctx.payload.get('y')") == 1
+
+
+def test_openapi_31_list_typed_schema_is_generated(tmp_path):
+    spec = {
+        "openapi": "3.1.0",
+        "info": {"title": "Nullable", "version": "1.0"},
+        "paths": {},
+        "components": {
+            "schemas": {
+                "Maybe": {"type": ["object", "null"], "properties": {"id": {"type": "integer"}}},
+            }
+        },
+    }
+    parser = OpenAPIParser()
+    parser._parse_spec(spec)
+    output = tmp_path / "server.py"
+
+    assert MCPGenerator(parser).generate(str(output))
+
+    code = output.read_text()
+    compile(code, str(output), "exec")
+    assert "class Maybe(BaseModel):" in code
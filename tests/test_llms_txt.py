@@ -0,0 +1,32 @@
+from openapi2mcp.generator import MCPGenerator
+from openapi2mcp.parser import OpenAPIParser
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Tools", "version": "1.0"},
+    "paths": {
+        "/items/{itemId}": {
+            "delete": {
+                "operationId": "deleteItem",
+                "parameters": [
+                    {"name": "itemId", "in": "path", "required": True, "schema": {"type": "string"}},
+                    {"name": "force", "in": "query", "schema": {"type": "boolean"}},
+                ],
+                "responses": {"204": {"description": "Deleted"}},
+            }
+        }
+    },
+}
+
+
+def test_llms_txt_lists_tool_parameters(tmp_path):
+    parser = OpenAPIParser()
+    parser._parse_spec(SPEC)
+    generator = MCPGenerator(parser)
+
+    assert generator.generate_llms_txt(str(tmp_path))
+
+    content = (tmp_path / "llms.txt").read_text()
+    assert "Tool Name: deleteItem" in content
+    assert "    - itemId (path, type: str, required)" in content
+    assert "    - force (query, type: Optional[bool], optional)" in content
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from openapi2mcp.parser import OpenAPIParser, OpenAPIParserError
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+
+
+def test_cyclic_schemas_are_parsed():
+    parser = OpenAPIParser()
+    parser.parse_file(EXAMPLES_DIR / "cyclic_openapi.yaml")
+
+    assert set(parser.schemas) == {"Employee", "Department", "Company"}
+    employee = parser.schemas["Employee"]
+    assert employee.properties["reports_to"] == {"type": "Employee", "is_ref": True}
+    assert employee.properties["manages"] == "List[Employee]"
+    assert employee.properties["department"] == {"type": "Department", "is_ref": True}
+    assert parser.schemas["Company"].properties["departments"] == "List[Department]"
+
+
+def test_self_referencing_schema_is_parsed():
+    spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Tree", "version": "1.0"},
+        "paths": {},
+        "components": {
+            "schemas": {
+                "Node": {
+                    "type": "object",
+                    "properties": {
+                        "parent": {"$ref": "#/components/schemas/Node"},
+                        "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}},
+                    },
+                }
+            }
+        },
+    }
+    parser = OpenAPIParser()
+    parser._parse_spec(spec)
+
+    node = parser.schemas["Node"]
+    assert node.type == "Node"
+    assert node.properties["parent"] == {"type": "Node", "is_ref": True}
+    assert node.properties["children"] == "List[Node]"
+
+
+
+def _write_spec(path, schemas):
+    spec = {"openapi": "3.0.0", "info": {"title": "T", "version": "1.0"}, "paths": {}, "components": {"schemas": schemas}}
+    path.write_text(json.dumps(spec))
+    return path
+
+
+def test_failed_schema_parse_does_not_leave_a_cycle_proxy_behind(tmp_path):
+    parser = OpenAPIParser()
+    broken_spec = _write_spec(tmp_path / "broken.json", {"Thing": {"$ref": "#/components/schemas/Missing"}})
+    with pytest.raises(OpenAPIParserError):
+        parser.parse_file(broken_spec)
+
+    # A later, valid spec references the schema that failed above: it must be parsed for real, not proxied
+    fixed_spec = _write_spec(
+        tmp_path / "fixed.json",
+        {
+            "Thing": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "Holder": {"type": "object", "properties": {"thing": {"$ref": "#/components/schemas/Thing"}}},
+        },
+    )
+    parser.parse_file(fixed_spec)
+
+    assert parser.schemas["Thing"].properties == {"name": "str"}
+    assert parser.schemas["Holder"].properties["thing"] == {"type": "Thing", "is_ref": True}
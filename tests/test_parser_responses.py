@@ -0,0 +1,33 @@
+from openapi2mcp.parser import OpenAPIParser
+
+
+def test_integer_status_code_keys_are_accepted():
+    # YAML loads an unquoted `200:` response key as an int
+    spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Items", "version": "1.0"},
+        "paths": {
+            "/items": {
+                "get": {
+                    "operationId": "listItems",
+                    "responses": {
+                        200: {
+                            "description": "OK",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"type": "object", "properties": {"id": {"type": "integer"}}}
+                                }
+                            },
+                        }
+                    },
+                }
+            }
+        },
+    }
+    parser = OpenAPIParser()
+    parser._parse_spec(spec)
+
+    response_schema = parser.operations[0].response_schema
+    assert response_schema is not None
+    assert response_schema.name == "listItems_ResponseBody"
+    assert response_schema.properties["id"] == "int"
@@ -0,0 +1,28 @@
+from openapi2mcp.parser import OpenAPIParser
+
+
+def test_openapi_31_list_types_fall_back_to_any():
+    # OpenAPI 3.1 allows `type` to be a list, e.g. a nullable string
+    spec = {
+        "openapi": "3.1.0",
+        "info": {"title": "Nullable", "version": "1.0"},
+        "paths": {
+            "/things": {
+                "get": {
+                    "operationId": "listThings",
+                    "parameters": [{"name": "q", "in": "query", "schema": {"type": ["string", "null"]}}],
+                    "responses": {"200": {"description": "OK"}},
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "Thing": {"type": "object", "properties": {"nick": {"type": ["string", "null"]}}},
+            }
+        },
+    }
+    parser = OpenAPIParser()
+    parser._parse_spec(spec)
+
+    assert parser.schemas["Thing"].properties["nick"] == "Any"
+    assert parser.operations[0].parameters[0].type == "Any"